@@ -1,90 +1,318 @@
 #!/usr/bin/env python3
 """
 RSS Feed Extractor for BeACleaner Blog
-This script fetches the RSS feed from beacleaner.com, extracts blog post links
-and their published dates, and outputs them in the requested format.
+This script fetches the RSS feed from beacleaner.com (or any other feeds given
+with --url), extracts blog post links and their published dates, and outputs
+them in the requested format.
 """
 
+import argparse
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-import dateutil.parser
+try:
+    import lxml.etree as ET
+except ImportError:  # Fall back to the stdlib SAX parser
+    ET = None
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
+import json
+import os
 import sys
+import threading
 import traceback
 import time
+import xml.sax
+from file_utils import atomic_write
 
 # URL of the RSS feed
 RSS_URL = "https://www.beacleaner.com/rss.xml"
+# File receiving the extraction results
+RESULTS_FILE = "rss_extract_results.txt"
+# Maximum number of feeds fetched concurrently
+MAX_FEED_WORKERS = 16
 # Maximum number of retry attempts
 MAX_RETRIES = 3
 # Delay between retries (in seconds)
 RETRY_DELAY = 5
+# File tracking post links already reported by previous runs
+TRACK_FILE = "outputs/seen_posts.jsonl"
+# Only report posts published within this many days (0 disables the cutoff)
+DAYS_TO_INCLUDE = 15
+# File storing HTTP validators (ETag / Last-Modified) and body digest per feed
+# from the last fetch
+HTTP_CACHE_FILE = "outputs/http_cache.json"
+# RFC-822 date format used by RSS <pubDate>
+PUB_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S %z"
+# Bytes read per chunk when feeding the SAX fallback parser
+SAX_CHUNK_SIZE = 64 * 1024
+# Errors the XML parsers raise on malformed or truncated feeds
+XML_PARSE_ERRORS = (xml.sax.SAXParseException,) + ((ET.XMLSyntaxError,) if ET is not None else ())
 
-def fetch_rss(url, retries=MAX_RETRIES):
+# Connection pool shared by every worker's session so retries and feeds on the
+# same host reuse connections; urllib3's pool manager is thread-safe.
+_ADAPTER = requests.adapters.HTTPAdapter(pool_maxsize=MAX_FEED_WORKERS)
+# requests.Session (cookies, headers) is not documented as thread-safe, so
+# each worker thread gets its own
+_thread_local = threading.local()
+
+def get_session():
+    """
+    Return the calling thread's session, creating it on first use.
+    requests already advertises every content encoding it can decode (gzip,
+    deflate, and br when brotli is installed), so the feed arrives compressed.
+    """
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("https://", _ADAPTER)
+        session.mount("http://", _ADAPTER)
+        _thread_local.session = session
+    return session
+
+def load_http_cache():
+    """
+    Load HTTP validators saved by the previous run, keyed by feed URL
+    """
+    if not os.path.exists(HTTP_CACHE_FILE):
+        return {}
+    try:
+        with open(HTTP_CACHE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read {HTTP_CACHE_FILE}: {e}")
+        return {}
+
+def save_http_cache(http_cache):
+    """
+    Save HTTP validators for the next run
     """
-    Fetch RSS feed with retry logic
+    os.makedirs(os.path.dirname(HTTP_CACHE_FILE), exist_ok=True)
+    atomic_write(HTTP_CACHE_FILE, json.dumps(http_cache, indent=2))
+
+def load_seen_posts(track_file):
+    """
+    Load the set of post links reported by previous runs.
+    The track file is JSON lines: a {"last_run": ...} header, then one link per line.
+    """
+    seen_urls = set()
+    if not os.path.exists(track_file):
+        return seen_urls
+    try:
+        with open(track_file, "r") as f:
+            f.readline()  # Skip the last_run header
+            for line_number, line in enumerate(f, start=2):
+                if not line.strip():
+                    continue
+                try:
+                    seen_urls.add(json.loads(line))
+                except ValueError as e:
+                    # Skip just this entry so one bad line does not re-report the whole feed
+                    print(f"Warning: Skipping bad line {line_number} in {track_file}: {e}")
+    except OSError as e:
+        print(f"Warning: Could not read {track_file}: {e}")
+    return seen_urls
+
+def save_seen_posts(track_file, new_urls):
     """
+    Record newly reported post links for the next run.
+    Only the new links are appended; the fixed-width last_run header is
+    overwritten in place afterwards, so the existing entries are never
+    rewritten and a crash in between leaves the previous last_run.
+    """
+    header = json.dumps({"last_run": datetime.now().isoformat(timespec="microseconds")}) + "\n"
+    new_lines = "".join(json.dumps(url) + "\n" for url in sorted(new_urls))
+    
+    if os.path.exists(track_file):
+        with open(track_file, "r+") as f:
+            if len(f.readline()) == len(header):
+                f.seek(0, os.SEEK_END)
+                f.write(new_lines)
+                f.flush()
+                os.fsync(f.fileno())
+                f.seek(0)
+                f.write(header)
+                return
+        # Unexpected header, fall back to a full rewrite
+        new_lines = "".join(json.dumps(url) + "\n" for url in sorted(load_seen_posts(track_file) | set(new_urls)))
+    
+    os.makedirs(os.path.dirname(track_file) or ".", exist_ok=True)
+    atomic_write(track_file, header + new_lines)
+
+def fetch_rss(url, http_cache, retries=MAX_RETRIES, retry_delay=RETRY_DELAY, log=print):
+    """
+    Fetch RSS feed with retry logic.
+    Sends a conditional GET using the cached validators and returns None when
+    the server answers 304 Not Modified. On 200 the cache is updated in place
+    and the streaming response is returned so the body can be parsed as it
+    arrives; the caller is responsible for closing it.
+    """
+    headers = {}
+    if http_cache.get("etag"):
+        headers["If-None-Match"] = http_cache["etag"]
+    if http_cache.get("last_modified"):
+        headers["If-Modified-Since"] = http_cache["last_modified"]
+    
     for attempt in range(retries):
         try:
-            response = requests.get(url, timeout=30)
+            response = get_session().get(url, headers=headers, timeout=30, stream=True)
+            if response.status_code == 304:
+                response.close()
+                return None
             response.raise_for_status()
-            return response.content
+            http_cache["etag"] = response.headers.get("ETag")
+            http_cache["last_modified"] = response.headers.get("Last-Modified")
+            # Let urllib3 undo gzip/deflate transfer encoding for the parser
+            response.raw.decode_content = True
+            return response
         except requests.exceptions.RequestException as e:
             if attempt < retries - 1:
-                print(f"Attempt {attempt + 1} failed: {e}. Retrying in {RETRY_DELAY} seconds...")
-                time.sleep(RETRY_DELAY)
+                log(f"Attempt {attempt + 1} failed: {e}. Retrying in {retry_delay} seconds...")
+                time.sleep(retry_delay)
             else:
                 raise Exception(f"Failed to fetch RSS feed after {retries} attempts: {e}")
 
-def parse_rss(content):
+def parse_pub_date(pub_date_str):
     """
-    Parse RSS content and extract posts
+    Parse an RSS <pubDate> value
     """
-    # Try multiple parsing methods to handle different XML formats
-    for parser in ["xml", "lxml-xml", "html.parser"]:
-        try:
-            soup = BeautifulSoup(content, parser)
-            items = soup.find_all("item")
-            if items:
-                break
-        except Exception as e:
-            print(f"Parser {parser} failed: {e}")
-    
-    if not items:
-        raise ValueError("No items found in the RSS feed. Check the format.")
-    
-    print(f"Successfully found {len(items)} items in the RSS feed using {parser} parser.")
+    try:
+        return parsedate_to_datetime(pub_date_str)
+    except (TypeError, ValueError):
+        return datetime.strptime(pub_date_str, PUB_DATE_FORMAT)
+
+class RSSHandler(xml.sax.ContentHandler):
+    """
+    SAX handler collecting (link, pubDate, title) for every channel item
+    """
+    # Element paths whose text is captured
+    _CAPTURED = {
+        ("rss", "channel", "item", "link"): "link",
+        ("rss", "channel", "item", "pubDate"): "pub_date",
+        ("rss", "channel", "item", "title"): "title",
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.items = []
+        self._stack = []
+        self._field = None
+        self._text = []
+        self._current = {}
+
+    def startElement(self, name, attrs):
+        self._stack.append(name)
+        self._field = self._CAPTURED.get(tuple(self._stack))
+        self._text = []
+
+    def characters(self, content):
+        if self._field:
+            self._text.append(content)
+
+    def endElement(self, name):
+        if self._field:
+            self._current[self._field] = "".join(self._text).strip()
+            self._field = None
+        elif self._stack == ["rss", "channel", "item"]:
+            self.items.append((
+                self._current.get("link", ""),
+                self._current.get("pub_date", ""),
+                self._current.get("title"),
+            ))
+            self._current = {}
+        self._stack.pop()
+
+def iter_items(source):
+    """
+    Yield (link, pub_date_str, title) for each <item> read from source.
+    Uses lxml iterparse when available, falling back to an expat SAX parser.
+    """
+    if ET is not None:
+        # Stream over <item> elements instead of building the whole tree;
+        # recover=True lets stray "&" or HTML entities through like BS4 did
+        for _, item in ET.iterparse(source, events=("end",), tag="item", recover=True):
+            yield (
+                (item.findtext("link") or "").strip(),
+                (item.findtext("pubDate") or "").strip(),
+                item.findtext("title"),
+            )
+            # Free the processed item and any siblings already handled
+            item.clear()
+            while item.getprevious() is not None:
+                del item.getparent()[0]
+        return
     
+    handler = RSSHandler()
+    parser = xml.sax.make_parser()
+    parser.setContentHandler(handler)
+    try:
+        while True:
+            chunk = source.read(SAX_CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            yield from handler.items
+            handler.items.clear()
+        parser.close()
+    except xml.sax.SAXParseException:
+        # Hand over the items completed before the error, then report it
+        yield from handler.items
+        raise
+    yield from handler.items
+
+def parse_rss(source, seen_urls=frozenset(), cutoff_date=None, log=print):
+    """
+    Parse RSS content read from a file-like object and extract posts.
+    Posts already in seen_urls or published before cutoff_date are skipped.
+    Feeds are newest-first, so parsing stops at the first already seen post
+    older than cutoff_date.
+    """
     # Group by published date
     posts_by_date = defaultdict(list)
+    item_count = 0
     
-    for item in items:
-        try:
-            # Extract link and publication date
-            link_tag = item.find("link")
-            if not link_tag or not link_tag.text.strip():
-                print("Warning: Item missing link tag or empty link")
-                continue
+    items = iter_items(source)
+    try:
+        for link, pub_date_str, title in items:
+            item_count += 1
+            try:
+                # Check link and publication date
+                if not link:
+                    log("Warning: Item missing link tag or empty link")
+                    continue
                 
-            link = link_tag.text.strip()
-            
-            # Extract publication date
-            pub_date_tag = item.find("pubDate")
-            if not pub_date_tag or not pub_date_tag.text.strip():
-                print(f"Warning: Item with link '{link}' is missing pubDate tag or empty date")
-                continue
-            
-            pub_date_str = pub_date_tag.text.strip()
-            # Parse the date
-            pub_date = dateutil.parser.parse(pub_date_str)
-            date_key = pub_date.strftime("%Y-%m-%d")
-            
-            # Store the link under its date
-            posts_by_date[date_key].append(link)
-        except Exception as e:
-            title = item.find("title").text if item.find("title") else "Unknown"
-            print(f"Warning: Error processing item '{title}': {e}")
+                if not pub_date_str:
+                    log(f"Warning: Item with link '{link}' is missing pubDate tag or empty date")
+                    continue
+                
+                # Parse the date
+                pub_date = parse_pub_date(pub_date_str)
+                if cutoff_date and pub_date.date() < cutoff_date:
+                    if link in seen_urls:
+                        # Nothing further down the feed can be newer
+                        break
+                    continue
+                
+                if link in seen_urls:
+                    continue
+                date_key = f"{pub_date.year:04d}-{pub_date.month:02d}-{pub_date.day:02d}"
+                
+                # Store the link under its date
+                posts_by_date[date_key].append(link)
+            except Exception as e:
+                log(f"Warning: Error processing item '{title or 'Unknown'}': {e}")
+    except XML_PARSE_ERRORS as e:
+        # Keep what was parsed before the feed became unreadable
+        log(f"Warning: Stopped parsing after {item_count} items, malformed feed: {e}")
+    # Release the parser state if we stopped early
+    items.close()
+    
+    if not item_count:
+        raise ValueError("No items found in the RSS feed. Check the format.")
+    
+    log(f"Successfully found {item_count} items in the RSS feed.")
     
     return posts_by_date
 
@@ -92,45 +320,160 @@ def format_output(posts_by_date):
     """
     Format posts by date into the required output format
     """
-    # Sort dates in descending order
-    sorted_dates = sorted(posts_by_date.keys(), reverse=True)
+    # Feeds are newest-first, so dates were inserted in descending order
+    # already; only sort when that does not hold (e.g. merged feeds)
+    sorted_dates = list(posts_by_date.keys())
+    if any(newer < older for newer, older in zip(sorted_dates, sorted_dates[1:])):
+        sorted_dates.sort(reverse=True)
     
     # Format output
-    output_lines = []
+    buf = io.StringIO()
     for date in sorted_dates:
+        buf.write("published date: ")
+        buf.write(date)
+        buf.write("  \n")
         for link in posts_by_date[date]:
-            output_lines.append(f"{link}")
-        output_lines.append("")  # Add blank line between date groups
+            buf.write("link: ")
+            buf.write(link)
+            buf.write("\n")
+        buf.write("\n")  # Add blank line between date groups
     
-    return output_lines
+    return buf.getvalue()
 
-def main():
+class HashingReader:
+    """
+    File-like wrapper computing the SHA-256 of everything read through it
+    """
+    def __init__(self, raw):
+        self._raw = raw
+        self._sha256 = hashlib.sha256()
+
+    def read(self, size=None):
+        data = self._raw.read(size)
+        self._sha256.update(data)
+        return data
+
+    def drain(self):
+        """
+        Read whatever the parser left unread and return the hex digest of the whole body
+        """
+        while self.read(SAX_CHUNK_SIZE):
+            pass
+        return self._sha256.hexdigest()
+
+def extract_feed(url, http_cache, seen_urls, cutoff_date, retries, retry_delay):
+    """
+    Fetch and parse a single feed.
+    Runs in a worker thread, so messages are collected and returned alongside
+    the posts (None when the feed has not changed since the last run) for the
+    caller to print.
+    """
+    messages = []
+    response = fetch_rss(url, http_cache, retries, retry_delay, log=messages.append)
+    if response is None:
+        messages.append(f"Feed {url} not modified since last run.")
+        return None, messages
+    
+    # Parse the XML straight from the socket, hashing the body on the way
+    with response:
+        reader = HashingReader(response.raw)
+        posts_by_date = parse_rss(reader, seen_urls, cutoff_date, log=messages.append)
+        # The digest must cover the whole body even when parsing stopped early
+        digest = reader.drain()
+    
+    # Servers that ignore conditional requests often still send the same body
+    if digest == http_cache.get("body_sha256"):
+        messages.append(f"Feed {url} unchanged since last run.")
+        return None, messages
+    http_cache["body_sha256"] = digest
+    
+    return posts_by_date, messages
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Extract new blog post links from the BeACleaner RSS feed.")
+    parser.add_argument("--url", dest="urls", action="append",
+                        help=f"RSS feed to extract, may be repeated (default: {RSS_URL})")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES,
+                        help=f"maximum number of fetch attempts (default: {MAX_RETRIES})")
+    parser.add_argument("--retry-delay", type=float, default=RETRY_DELAY,
+                        help=f"seconds to wait between attempts (default: {RETRY_DELAY})")
+    parser.add_argument("--track", default=TRACK_FILE,
+                        help=f"file tracking already reported posts (default: {TRACK_FILE})")
+    parser.add_argument("--days", type=int, default=DAYS_TO_INCLUDE,
+                        help=f"only include posts from the last N days, 0 for all (default: {DAYS_TO_INCLUDE})")
+    args = parser.parse_args(argv)
+    if not args.urls:
+        args.urls = [RSS_URL]
+    # A feed given twice would have two workers sharing its cache entry
+    args.urls = list(dict.fromkeys(args.urls))
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
     try:
-        print(f"Starting RSS feed extraction from {RSS_URL}")
+        print(f"Starting RSS feed extraction from {', '.join(args.urls)}")
         
-        # Fetch the RSS feed
-        content = fetch_rss(RSS_URL)
+        http_cache = load_http_cache()
+        seen_urls = load_seen_posts(args.track)
+        cutoff_date = datetime.now().date() - timedelta(days=args.days) if args.days > 0 else None
         
-        # Parse the XML
-        posts_by_date = parse_rss(content)
+        # Fetch and parse the feeds concurrently so network latency overlaps
+        with ThreadPoolExecutor(max_workers=min(MAX_FEED_WORKERS, len(args.urls))) as executor:
+            futures = [
+                executor.submit(extract_feed, url, http_cache.setdefault(url, {}), seen_urls,
+                                cutoff_date, args.retries, args.retry_delay)
+                for url in args.urls
+            ]
+            results = []
+            for future in futures:
+                result, messages = future.result()
+                for message in messages:
+                    print(message)
+                results.append(result)
         
-        # Format the output
-        output_lines = format_output(posts_by_date)
+        if all(result is None for result in results):
+            atomic_write(RESULTS_FILE, "Feed not modified since last run.\n"
+                                       f"Extraction timestamp: {datetime.now().isoformat()}")
+            # An unchanged body may still come with new validators
+            save_http_cache(http_cache)
+            return 0
         
-        # Save to file
-        with open("rss_extract_results.txt", "w") as f:
-            f.write("\n".join(output_lines))
+        # Merge the per-feed results, reporting links shared by several feeds once
+        posts_by_date = defaultdict(list)
+        new_urls = set()
+        for result in results:
+            for date, links in (result or {}).items():
+                for link in links:
+                    if link not in new_urls:
+                        new_urls.add(link)
+                        posts_by_date[date].append(link)
         
         total_posts = sum(len(links) for links in posts_by_date.values())
-        print(f"Successfully extracted {total_posts} posts from RSS feed.")
-        print(f"Results saved to rss_extract_results.txt")
+        if total_posts:
+            # Format the output and save to file
+            atomic_write(RESULTS_FILE, format_output(posts_by_date))
+            
+            print(f"Successfully extracted {total_posts} new posts from RSS feed.")
+        else:
+            print("No new posts found since last run.")
+            atomic_write(RESULTS_FILE, "No new posts found since last run.\n"
+                                       f"Extraction timestamp: {datetime.now().isoformat()}")
+        print(f"Results saved to {RESULTS_FILE}")
+        
+        # Remember reported posts so the next run only picks up new ones
+        save_seen_posts(args.track, new_urls)
+        
+        # Only remember the validators once the feed was processed successfully
+        save_http_cache(http_cache)
         
     except Exception as e:
         print(f"Error extracting RSS feed: {str(e)}")
         traceback.print_exc()  # Print full stack trace for debugging
-        with open("rss_extract_results.txt", "w") as f:
-            f.write(f"Error occurred during extraction: {str(e)}\n")
-            f.write(f"Timestamp: {datetime.now().isoformat()}")
+        atomic_write(RESULTS_FILE, f"Error occurred during extraction: {str(e)}\n"
+                                   f"Timestamp: {datetime.now().isoformat()}")
         return 1
     
     return 0
@@ -0,0 +1,16 @@
+"""
+File helpers shared by the RSS workflow scripts
+"""
+
+import os
+
+def atomic_write(path, data):
+    """
+    Write data to path atomically.
+    The data goes to a temporary file next to path which then replaces it, so
+    readers never see a partially written file if the process dies mid-write.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
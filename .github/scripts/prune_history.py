@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+History Pruner for the RSS Feed Extractor
+This script keeps outputs/rss_extract_history.txt bounded by retaining only
+the most recent published dates and their links.
+"""
+
+import argparse
+import sys
+import traceback
+from file_utils import atomic_write
+
+# History file appended to by the workflow
+HISTORY_FILE = "outputs/rss_extract_history.txt"
+# Number of most recent published dates to keep
+MAX_HISTORY_DATES = 30
+
+_DATE_PREFIX = "published date: "
+_LINK_PREFIX = "link: "
+_URL_PREFIXES = ("http://", "https://")
+
+def prune_history_file(file_path=HISTORY_FILE, max_dates=MAX_HISTORY_DATES):
+    """
+    Rewrite the history file keeping only the newest max_dates dates
+    (all of them when max_dates is 0).
+    "link: " lines and bare URLs from the older output format are both kept
+    as links of their date. Everything else, such as the per-run
+    "No new posts found" and timestamp notes, carries no post and is dropped.
+    """
+    # Single pass over the lines: a date header starts a block, links belong
+    # to the most recent header (or to an undated group before the first one)
+    undated = {}
+    date_links = {}
+    links = undated
+    with open(file_path, "r") as f:
+        for line in f:
+            if line.startswith(_DATE_PREFIX):
+                date = line[len(_DATE_PREFIX):len(_DATE_PREFIX) + 10]
+                links = date_links.setdefault(date, {})
+                continue
+            if line.startswith(_LINK_PREFIX):
+                line = line[len(_LINK_PREFIX):]
+            link = line.strip()
+            if link.startswith(_URL_PREFIXES):
+                # The same date can appear in several runs; an insertion-ordered
+                # dict keeps each link once
+                links[link] = None
+
+    kept_dates = sorted(date_links, reverse=True)
+    if max_dates:
+        kept_dates = kept_dates[:max_dates]
+
+    output_lines = []
+    if undated:
+        output_lines.extend(f"link: {link}" for link in undated)
+        output_lines.append("")
+    for date in kept_dates:
+        output_lines.append(f"published date: {date}  ")
+        output_lines.extend(f"link: {link}" for link in date_links[date])
+        output_lines.append("")  # Add blank line between date groups
+
+    atomic_write(file_path, "\n".join(output_lines))
+
+    print(f"Kept {len(kept_dates)} of {len(date_links)} dates in {file_path}")
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Prune the RSS extract history file.")
+    parser.add_argument("--file", default=HISTORY_FILE,
+                        help=f"history file to prune in place (default: {HISTORY_FILE})")
+    parser.add_argument("--max-dates", type=int, default=MAX_HISTORY_DATES,
+                        help=f"number of most recent dates to keep, 0 for all (default: {MAX_HISTORY_DATES})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        prune_history_file(args.file, args.max_dates)
+    except Exception as e:
+        print(f"Error pruning history file: {str(e)}")
+        traceback.print_exc()  # Print full stack trace for debugging
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())